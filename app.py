@@ -5,13 +5,14 @@ from flask_bcrypt import Bcrypt
 from datetime import datetime, timedelta
 import os
 import logging
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, text
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
 import stripe
 import time
 from urllib.parse import urlparse
 from dotenv import load_dotenv
+from models import Base, User, Film, Purchase, upgrade_schema
 
 # Load environment variables
 load_dotenv()
@@ -23,37 +24,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize SQLAlchemy
-Base = declarative_base()
-
-# Define models
-class User(Base):
-    __tablename__ = 'users'
-    id = Column(Integer, primary_key=True)
-    name = Column(String)
-    email = Column(String, unique=True)
-    password = Column(String)
-    is_filmmaker = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-class Film(Base):
-    __tablename__ = 'films'
-    id = Column(Integer, primary_key=True)
-    title = Column(String)
-    description = Column(String)
-    price = Column(Float)
-    film_type = Column(String)
-    thumbnail_path = Column(String)
-    creator_id = Column(Integer, ForeignKey('users.id'))
-    file_path = Column(String)
-
-class Purchase(Base):
-    __tablename__ = 'purchases'
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
-    film_id = Column(Integer, ForeignKey('films.id'))
-    created_at = Column(DateTime, default=datetime.utcnow)
-
 # Check required environment variables
 required_vars = ['DATABASE_URL', 'JWT_SECRET_KEY']
 missing_vars = [var for var in required_vars if not os.getenv(var)]
@@ -160,6 +130,7 @@ def init_db():
             
             # Create all tables
             Base.metadata.create_all(bind=engine)
+            upgrade_schema(engine)
             logger.info("Database tables created successfully")
             
             # Create session factory
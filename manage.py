@@ -0,0 +1,349 @@
+"""Catalog management commands.
+
+Run outside the web process, e.g.:
+
+    python manage.py import-films catalog.csv --batch-size 5000
+    python manage.py export-films catalog.jsonl
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from models import Film, User
+
+# Load environment variables
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Columns read on import and written on export, in file order
+CATALOG_FIELDS = [
+    'external_id', 'title', 'description', 'price', 'film_type',
+    'thumbnail_path', 'file_path', 'creator_email',
+]
+
+class CommandError(Exception):
+    """Raised when a command cannot run against the configured database"""
+
+
+def get_engine():
+    """Create an engine for the same database as init_db in app.py
+
+    NullPool keeps the command on its own connection, never the web workers' pool.
+    """
+    if os.getenv('FLASK_ENV') == 'development':
+        database_url = 'sqlite:///filmila.db'
+        logger.info("Using SQLite database for development")
+        return create_engine(database_url, poolclass=NullPool)
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        raise CommandError("DATABASE_URL environment variable is not set")
+    # Handle potential "postgres://" URLs from Render
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    logger.info(f"Using PostgreSQL database: {database_url.split('@')[-1]}")
+    return create_engine(
+        database_url,
+        poolclass=NullPool,
+        # Batch bulk_update_mappings too, not just inserts
+        executemany_mode='values_plus_batch',
+        connect_args={
+            'connect_timeout': 10,  # Connection timeout in seconds
+            'sslmode': 'require'    # Enforce SSL
+        }
+    )
+
+
+def check_schema(engine):
+    """Make sure the web app has created the tables, including films.external_id
+
+    The schema belongs to app.py (init_db runs upgrade_schema), so this never
+    creates or alters tables itself.
+    """
+    inspector = inspect(engine)
+    missing = [table for table in ('users', 'films') if not inspector.has_table(table)]
+    if missing:
+        raise CommandError(f"Missing tables: {', '.join(missing)}. "
+                           "Start the web app once to create the schema.")
+    columns = {column['name'] for column in inspector.get_columns('films')}
+    if 'external_id' not in columns:
+        raise CommandError("films.external_id is missing. Deploy or start the web app "
+                           "once so init_db can add it.")
+
+
+def detect_format(path, fmt):
+    if fmt:
+        return fmt
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict) pairs one at a time from a CSV or JSONL stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"Invalid JSON: {e.msg}")
+                continue
+            yield line_no, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class UserLookup:
+    """Resolve creator emails to user ids, caching each email after its first query"""
+
+    def __init__(self, session):
+        self.session = session
+        self.cache = {}
+
+    def __call__(self, email):
+        if email not in self.cache:
+            user = self.session.query(User.id).filter_by(email=email).first()
+            self.cache[email] = user.id if user else None
+        return self.cache[email]
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def validate_film(row, lookup_user):
+    """Turn a raw catalog row into a Film mapping, raising ValueError if it is unusable"""
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("Row must be an object")
+
+    external_id = _clean(row.get('external_id'))
+    if not external_id:
+        raise ValueError("Missing external_id")
+
+    title = _clean(row.get('title'))
+    if not title:
+        raise ValueError("Missing title")
+
+    price = _clean(row.get('price'))
+    if price is not None:
+        try:
+            price = float(price)
+        except ValueError:
+            raise ValueError(f"Invalid price: {price!r}")
+        if not math.isfinite(price) or price < 0:
+            raise ValueError(f"Invalid price: {price} (must be a non-negative amount)")
+
+    creator_id = None
+    creator_email = _clean(row.get('creator_email'))
+    if creator_email:
+        creator_id = lookup_user(creator_email)
+        if creator_id is None:
+            raise ValueError(f"Unknown creator_email: {creator_email}")
+
+    return {
+        'external_id': external_id,
+        'title': title,
+        'description': _clean(row.get('description')),
+        'price': price,
+        'film_type': _clean(row.get('film_type')),
+        'thumbnail_path': _clean(row.get('thumbnail_path')),
+        'file_path': _clean(row.get('file_path')),
+        'creator_id': creator_id,
+    }
+
+
+def upsert_films(session, mappings):
+    """Insert new films and update existing ones keyed on external_id, in one transaction
+
+    Returns a (inserted, updated) tuple.
+    """
+    # Last occurrence wins when a batch repeats an external_id
+    by_external_id = {mapping['external_id']: mapping for mapping in mappings}
+
+    existing = dict(
+        session.query(Film.external_id, Film.id)
+        .filter(Film.external_id.in_(list(by_external_id)))
+    )
+
+    inserts = []
+    updates = []
+    for external_id, mapping in by_external_id.items():
+        if external_id in existing:
+            updates.append(dict(mapping, id=existing[external_id]))
+        else:
+            inserts.append(mapping)
+
+    try:
+        if inserts:
+            session.bulk_insert_mappings(Film, inserts)
+        if updates:
+            session.bulk_update_mappings(Film, updates)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return len(inserts), len(updates)
+
+
+def import_films(session, stream, fmt, batch_size):
+    """Stream a catalog file into the films table, committing every batch_size valid rows
+
+    Raises CommandError if a batch hits a unique constraint; earlier batches stay committed.
+    """
+    lookup_user = UserLookup(session)
+    stats = {'inserted': 0, 'updated': 0, 'rejected': 0}
+
+    def valid_rows():
+        for line_no, row in read_rows(stream, fmt):
+            try:
+                yield line_no, validate_film(row, lookup_user)
+            except ValueError as e:
+                stats['rejected'] += 1
+                logger.warning(f"Skipping line {line_no}: {str(e)}")
+
+    for batch in batched(valid_rows(), batch_size):
+        first_line = batch[0][0]
+        try:
+            inserted, updated = upsert_films(session, [mapping for _, mapping in batch])
+        except IntegrityError as e:
+            # Usually another import inserted the same external_id after our lookup
+            raise CommandError(
+                f"Batch starting at line {first_line} conflicted with existing films "
+                f"and was rolled back: {e.orig}. "
+                f"{stats['inserted'] + stats['updated']} rows from earlier batches were "
+                "committed; rerun the import to finish."
+            ) from e
+        stats['inserted'] += inserted
+        stats['updated'] += updated
+        logger.info(f"Committed batch: {inserted} inserted, {updated} updated "
+                    f"({stats['inserted'] + stats['updated']} total)")
+
+    return stats
+
+
+def export_films(session, stream, fmt, batch_size):
+    """Write every film to a catalog file, reading rows through a server-side cursor"""
+    query = (
+        session.query(
+            Film.external_id,
+            Film.title,
+            Film.description,
+            Film.price,
+            Film.film_type,
+            Film.thumbnail_path,
+            Film.file_path,
+            User.email.label('creator_email'),
+        )
+        .outerjoin(User, User.id == Film.creator_id)
+        .order_by(Film.id)
+        .yield_per(batch_size)
+    )
+
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            stream.write(json.dumps(row) + '\n')
+
+    count = 0
+    for film in query:
+        write(dict(zip(CATALOG_FIELDS, film)))
+        count += 1
+    return count
+
+
+def open_stream(path, mode):
+    if path == '-':
+        # Leave stdin/stdout open when the with-block exits
+        return nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Filmila catalog management')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in [
+        ('import-films', 'Upsert films from a CSV or JSONL catalog, keyed on external_id'),
+        ('export-films', 'Export all films to a CSV or JSONL catalog'),
+    ]:
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument('path', help="Catalog file path, or '-' for stdin/stdout")
+        subparser.add_argument('--format', choices=['csv', 'jsonl'],
+                               help='File format (default: from file extension, else csv)')
+        subparser.add_argument('--batch-size', type=int, default=1000,
+                               help='Rows per transaction on import, rows per fetch on export')
+
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    fmt = detect_format(args.path, args.format)
+
+    try:
+        engine = get_engine()
+        check_schema(engine)
+    except CommandError as e:
+        logger.error(str(e))
+        return 2
+
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        if args.command == 'import-films':
+            with open_stream(args.path, 'r') as stream:
+                try:
+                    stats = import_films(session, stream, fmt, args.batch_size)
+                except CommandError as e:
+                    logger.error(str(e))
+                    return 2
+            logger.info(f"Import finished: {stats['inserted']} inserted, "
+                        f"{stats['updated']} updated, {stats['rejected']} rejected")
+            return 1 if stats['rejected'] else 0
+
+        with open_stream(args.path, 'w') as stream:
+            count = export_films(session, stream, fmt, args.batch_size)
+        logger.info(f"Export finished: {count} films written")
+        return 0
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
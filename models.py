@@ -1,43 +1,53 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, inspect, text
+from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
+# Shared by app.py and manage.py so both work against the same tables
 Base = declarative_base()
 
 class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __tablename__ = 'users'
+    id = Column(Integer, primary_key=True)
     name = Column(String)
-    email = Column(String, unique=True, index=True)
+    email = Column(String, unique=True)
     password = Column(String)
     is_filmmaker = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Film(Base):
-    __tablename__ = "films"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __tablename__ = 'films'
+    id = Column(Integer, primary_key=True)
+    external_id = Column(String, unique=True, index=True)  # Distributor catalog id
     title = Column(String)
     description = Column(String)
-    price = Column(Integer)  # Price in cents
+    price = Column(Float)
+    film_type = Column(String)
+    thumbnail_path = Column(String)
+    creator_id = Column(Integer, ForeignKey('users.id'))
     file_path = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-    user = relationship("User", back_populates="films")
-    purchases = relationship("Purchase", back_populates="film")
 
 class Purchase(Base):
-    __tablename__ = "purchases"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    film_id = Column(Integer, ForeignKey("films.id"))
+    __tablename__ = 'purchases'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    film_id = Column(Integer, ForeignKey('films.id'))
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship("User")
-    film = relationship("Film", back_populates="purchases")
-
-User.films = relationship("Film", back_populates="user")
+def upgrade_schema(engine):
+    """Add columns that create_all cannot add to tables which already exist
+
+    Safe to run on every startup. On PostgreSQL an advisory lock serializes
+    gunicorn workers that start at the same time.
+    """
+    with engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('filmila_upgrade_schema'))"))
+            conn.execute(text("ALTER TABLE films ADD COLUMN IF NOT EXISTS external_id VARCHAR"))
+        else:
+            # SQLite has no ADD COLUMN IF NOT EXISTS
+            columns = {column['name'] for column in inspect(conn).get_columns('films')}
+            if 'external_id' not in columns:
+                conn.execute(text("ALTER TABLE films ADD COLUMN external_id VARCHAR"))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_films_external_id ON films (external_id)"
+        ))
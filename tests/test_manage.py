@@ -0,0 +1,139 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import manage
+from models import Base, Film, User
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine('sqlite://', poolclass=StaticPool,
+                           connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(manage, 'get_engine', lambda: engine)
+    return engine
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    session.add(User(email='maker@example.com', is_filmmaker=True))
+    session.commit()
+    yield session
+    session.close()
+
+
+def write_catalog(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    return str(path)
+
+
+def test_import_inserts_then_updates_on_external_id(session):
+    first = io.StringIO('external_id,title,price,creator_email\n'
+                        'EXT-1,Original,9.99,maker@example.com\n')
+    stats = manage.import_films(session, first, 'csv', batch_size=10)
+    assert stats == {'inserted': 1, 'updated': 0, 'rejected': 0}
+
+    second = io.StringIO('{"external_id": "EXT-1", "title": "Renamed", "price": 12.0}\n')
+    stats = manage.import_films(session, second, 'jsonl', batch_size=10)
+    assert stats == {'inserted': 0, 'updated': 1, 'rejected': 0}
+
+    films = session.query(Film).all()
+    assert len(films) == 1
+    assert films[0].title == 'Renamed'
+    assert films[0].price == 12.0
+    assert films[0].creator_id is None
+
+
+def test_duplicate_external_ids_in_one_batch_keep_last_row(session):
+    stream = io.StringIO('external_id,title\nEXT-1,First\nEXT-1,Second\nEXT-2,Other\n')
+    stats = manage.import_films(session, stream, 'csv', batch_size=10)
+
+    assert stats == {'inserted': 2, 'updated': 0, 'rejected': 0}
+    assert session.query(Film.title).filter_by(external_id='EXT-1').scalar() == 'Second'
+
+
+def test_rejected_rows_are_skipped_and_exit_non_zero(session, tmp_path):
+    path = write_catalog(tmp_path, 'catalog.jsonl', [
+        {'external_id': 'EXT-1', 'title': 'Good', 'price': 4.5},
+        {'title': 'No id'},
+        {'external_id': 'EXT-3', 'title': 'Negative', 'price': -1},
+        {'external_id': 'EXT-4', 'title': 'Stranger', 'creator_email': 'nobody@example.com'},
+    ])
+
+    assert manage.main(['import-films', path]) == 1
+    assert [film.external_id for film in session.query(Film)] == ['EXT-1']
+
+
+def test_clean_import_exits_zero(session, tmp_path):
+    path = write_catalog(tmp_path, 'catalog.jsonl', [{'external_id': 'EXT-1', 'title': 'Good'}])
+    assert manage.main(['import-films', path]) == 0
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_export_round_trip(session, tmp_path, fmt):
+    source = write_catalog(tmp_path, 'source.jsonl', [
+        {'external_id': 'EXT-1', 'title': 'One', 'price': 9.99, 'film_type': 'short',
+         'creator_email': 'maker@example.com'},
+        {'external_id': 'EXT-2', 'title': 'Two', 'description': 'Second film'},
+    ])
+    assert manage.main(['import-films', source]) == 0
+
+    exported = str(tmp_path / f'export.{fmt}')
+    assert manage.main(['export-films', exported, '--batch-size', '1']) == 0
+    assert manage.main(['import-films', exported, '--format', fmt]) == 0
+
+    films = session.query(Film).order_by(Film.id).all()
+    assert [(film.external_id, film.title, film.price, film.film_type) for film in films] == [
+        ('EXT-1', 'One', 9.99, 'short'),
+        ('EXT-2', 'Two', None, None),
+    ]
+    assert films[0].creator_id == session.query(User.id).scalar()
+    assert films[1].description == 'Second film'
+
+
+def test_missing_external_id_column_is_reported(monkeypatch):
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR)')
+        conn.exec_driver_sql('CREATE TABLE films (id INTEGER PRIMARY KEY, title VARCHAR)')
+    monkeypatch.setattr(manage, 'get_engine', lambda: engine)
+
+    with pytest.raises(manage.CommandError, match='external_id'):
+        manage.check_schema(engine)
+    assert manage.main(['export-films', '-']) == 2
+
+
+def test_get_engine_requires_database_url_outside_development(monkeypatch):
+    monkeypatch.delenv('FLASK_ENV', raising=False)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+
+    with pytest.raises(manage.CommandError, match='DATABASE_URL'):
+        manage.get_engine()
+
+
+def test_import_reports_external_id_inserted_after_lookup(session, tmp_path, monkeypatch, caplog):
+    path = write_catalog(tmp_path, 'catalog.jsonl', [
+        {'external_id': 'EXT-1', 'title': 'First'},
+        {'external_id': 'EXT-2', 'title': 'Second'},
+    ])
+    bulk_insert_mappings = Session.bulk_insert_mappings
+
+    def racing_insert(self, mapper, mappings, *args, **kwargs):
+        # Another import commits EXT-2 between upsert_films' lookup and its insert
+        if mappings[0]['external_id'] == 'EXT-2':
+            self.execute(insert(Film).values(external_id='EXT-2', title='Racer'))
+        return bulk_insert_mappings(self, mapper, mappings, *args, **kwargs)
+
+    monkeypatch.setattr(Session, 'bulk_insert_mappings', racing_insert)
+
+    assert manage.main(['import-films', path, '--batch-size', '1']) == 2
+    assert 'Batch starting at line 2' in caplog.text
+    # The first batch stays committed; the conflicting one is rolled back whole
+    assert [film.external_id for film in session.query(Film)] == ['EXT-1']
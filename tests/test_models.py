@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, Film, upgrade_schema
+
+
+def test_upgrade_schema_adds_external_id_to_existing_films_table():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    with engine.begin() as conn:
+        # films as deployed before external_id existed
+        conn.exec_driver_sql('CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR)')
+        conn.exec_driver_sql(
+            'CREATE TABLE films (id INTEGER PRIMARY KEY, title VARCHAR, description VARCHAR, '
+            'price FLOAT, film_type VARCHAR, thumbnail_path VARCHAR, '
+            'creator_id INTEGER REFERENCES users (id), file_path VARCHAR)'
+        )
+        conn.exec_driver_sql("INSERT INTO films (title) VALUES ('Existing')")
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+
+    session = sessionmaker(bind=engine)()
+    assert [(film.title, film.external_id) for film in session.query(Film)] == [('Existing', None)]
+    indexes = {index['name']: index for index in inspect(engine).get_indexes('films')}
+    assert indexes['ix_films_external_id']['unique']
+
+
+def test_upgrade_schema_is_a_no_op_on_fresh_database():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    columns = [column['name'] for column in inspect(engine).get_columns('films')]
+    assert columns.count('external_id') == 1